@@ -16,8 +16,13 @@ import code
 
 from django.utils.datastructures import OrderedSet
 
+# readline补全只需要注册一次 Whether the readline completer has been installed;
+# repeated python() calls (e.g. embedded scenarios) skip reconfiguration.
+_completer_installed = False
+
 
 def python():  # 交互模式3
+    global _completer_installed
 
     # 1.shell 自带环境变量Set up a dictionary to serve as the environment for the shell.
     imported_objects = {}
@@ -47,7 +52,7 @@ def python():  # 交互模式3
     # write history to the .python_history file, but this can be overridden by
     # $PYTHONSTARTUP or ~/.pythonrc.py.
     try:
-        hook = sys.__interactivehook__im
+        hook = sys.__interactivehook__
     except AttributeError:
         # Match the behavior of the cpython shell where a missing
         # sys.__interactivehook__ is ignored.
@@ -64,13 +69,18 @@ def python():  # 交互模式3
 
     #   代码补全 Set up tab completion for objects imported by $PYTHONSTARTUP or
     # ~/.pythonrc.py.
-    try:
-        import readline
-        import rlcompleter
+    if not _completer_installed:
+        try:
+            import readline
+            import rlcompleter
 
-        readline.set_completer(rlcompleter.Completer(imported_objects).complete)
-    except ImportError:
-        pass
+            readline.set_completer(rlcompleter.Completer(imported_objects).complete)
+            # 注册一次tab补全绑定 Register the tab binding once up front.
+            readline.parse_and_bind("tab: complete")
+        except ImportError:
+            pass
+        else:
+            _completer_installed = True
 
     # 开始交互 核心代码 Start the interactive interpreter.
     imported_objects["name"] = "luoghong"
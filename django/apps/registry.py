@@ -40,6 +40,10 @@ class Apps:
         # set_available_apps and set_installed_apps.
         self.stored_app_configs = []
 
+        # Snapshot of get_app_configs() used by the migration loader;
+        # invalidated by clear_cache().
+        self._migration_loader_app_configs = None
+
         # Whether the registry is populated.
         self.apps_ready = self.models_ready = self.ready = False    # 初始化值为False
         # For the autoreloader.
@@ -373,6 +377,7 @@ class Apps:
 
         This is mostly used in tests.
         """
+        self._migration_loader_app_configs = None
         # Call expire cache on each model. This will purge
         # the relation tree and the fields cache.
         self.get_models.cache_clear()
@@ -1,8 +1,5 @@
-from django.core.checks.security.base import SECRET_KEY_INSECURE_PREFIX
 from django.core.management.templates import TemplateCommand
 
-from ..utils import get_random_secret_key
-
 
 class Command(TemplateCommand):
     help = (
@@ -12,6 +9,12 @@ class Command(TemplateCommand):
     missing_args_message = "You must provide a project name."
 
     def handle(self, **options):
+        # Imported here so that `manage.py help` doesn't pay for the checks
+        # framework just to read a string constant.
+        from django.core.checks.security.base import SECRET_KEY_INSECURE_PREFIX
+
+        from ..utils import get_random_secret_key
+
         project_name = options.pop("name")
         target = options.pop("directory")   # {'verbosity': 1, 'settings': None, 'pythonpath': None, 'traceback': False, 'no_color': False, 'force_color': False, 'directory': None, 'template': None, 'extensions': ['py'], 'files': []}
 
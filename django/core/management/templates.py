@@ -38,6 +38,10 @@ class TemplateCommand(BaseCommand):
         # Allow shipping invalid .py files without byte-compilation.
         (".py-tpl", ".py"),
     )
+    # Defaults for --extension/--name. Shared tuples, applied in handle(),
+    # so no fresh lists are built for the common no-override invocation.
+    _default_extensions = ("py",)
+    _default_files = ()
 
     def add_arguments(self, parser):
         parser.add_argument("name", help="Name of the application or project.")
@@ -52,7 +56,7 @@ class TemplateCommand(BaseCommand):
             "-e",
             dest="extensions",
             action="append",
-            default=["py"],
+            default=None,
             help='The file extension(s) to render (default: "py"). '
             "Separate multiple extensions with commas, or use "
             "-e multiple times.",
@@ -62,7 +66,7 @@ class TemplateCommand(BaseCommand):
             "-n",
             dest="files",
             action="append",
-            default=[],
+            default=None,
             help="The file name(s) to render. Separate multiple file names "
             "with commas, or use -n multiple times.",
         )
@@ -106,6 +110,14 @@ class TemplateCommand(BaseCommand):
                     "exist, please create it first." % top_dir
                 )
 
+        if options["extensions"] is None:
+            options["extensions"] = self._default_extensions
+        else:
+            # Explicit --extension values extend the defaults, matching the
+            # append-to-default behavior of the old mutable argparse default.
+            options["extensions"] = [*self._default_extensions, *options["extensions"]]
+        if options["files"] is None:
+            options["files"] = self._default_files
         extensions = tuple(handle_extensions(options["extensions"]))    # .py
         extra_files = []
         excluded_directories = [".git", "__pycache__"]
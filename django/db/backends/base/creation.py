@@ -69,10 +69,15 @@ class BaseDatabaseCreation:
         try:
             if self.connection.settings_dict["TEST"]["MIGRATE"] is False:
                 # Disable migrations for all apps.
+                from django.db.migrations.loader import _migrations_module
+
                 old_migration_modules = settings.MIGRATION_MODULES
                 settings.MIGRATION_MODULES = {
                     app.label: None for app in apps.get_app_configs()
                 }
+                # The setting is swapped without going through
+                # override_settings, so drop the memoized lookups manually.
+                _migrations_module.cache_clear()
             # We report migrate messages at one level lower than that
             # requested. This ensures we don't get flooded with messages during
             # testing (unless you really ask to be flooded).
@@ -86,6 +91,7 @@ class BaseDatabaseCreation:
         finally:
             if self.connection.settings_dict["TEST"]["MIGRATE"] is False:
                 settings.MIGRATION_MODULES = old_migration_modules
+                _migrations_module.cache_clear()
 
         # We then serialize the current state of the database into a string
         # and store it on the connection. This slightly horrific process is so people
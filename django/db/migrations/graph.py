@@ -86,17 +86,29 @@ class MigrationGraph:
     def __init__(self):
         self.node_map = {}  # 映射关系 “k1 ”: Node(k1)  k1为元祖 (app, migration_name)
         self.nodes = {}     # 字典
+        self._leaves_by_app = None  # app -> 叶子迁移名集合(懒加载缓存)
 
     def add_node(self, key, migration):
-        assert key not in self.node_map
-        node = Node(key)
+        existing = self.node_map.get(key)
+        if existing is None:
+            node = Node(key)
+        else:
+            # Promote a DummyNode created by an earlier add_dependency()
+            # edge pointing at this key; carry its edges over so order of
+            # node/edge insertion doesn't matter.
+            assert isinstance(existing, DummyNode), "node %r already added" % (key,)
+            node = Node(key)
+            node.children = existing.children
+            node.parents = existing.parents
         self.node_map[key] = node       # 迁移文件
         self.nodes[key] = migration     # 迁移类抽象
+        self._leaves_by_app = None
 
     def add_dummy_node(self, key, origin, error_message):
         node = DummyNode(key, origin, error_message)
         self.node_map[key] = node
         self.nodes[key] = None  # 无迁移文件
+        self._leaves_by_app = None
 
     def add_dependency(self, migration, child, parent, skip_validation=False):
         """ 添加依赖关系(父子关系) parent-父节点  skip_validation-是否校验虚拟节点
@@ -118,6 +130,7 @@ class MigrationGraph:
             self.add_dummy_node(parent, migration, error_message)
         self.node_map[child].add_parent(self.node_map[parent])
         self.node_map[parent].add_child(self.node_map[child])
+        self._leaves_by_app = None
         if not skip_validation:
             self.validate_consistency()     # 手动校验报错(存在虚拟节点-需要报错)
 
@@ -129,6 +142,7 @@ class MigrationGraph:
         """
         # Cast list of replaced keys to set to speed up lookup later.
         replaced = set(replaced)
+        self._leaves_by_app = None
         try:
             replacement_node = self.node_map[replacement]   # 获取替换节点 replacement_node
         except KeyError as err:
@@ -164,6 +178,7 @@ class MigrationGraph:
         nodes as they are expected to be correct already.
         """
         self.nodes.pop(replacement, None)
+        self._leaves_by_app = None
         try:
             replacement_node = self.node_map.pop(replacement)
         except KeyError as err:
@@ -264,6 +279,19 @@ class MigrationGraph:
                 leaves.add(node)
         return sorted(leaves)
 
+    def leaves_by_app(self):
+        """ # 按app分组的叶子节点缓存 detect_conflicts使用
+        Return a mapping of app label to the set of its leaf migration names.
+        Cached until the graph is mutated.
+        """
+        if self._leaves_by_app is None:
+            leaves = {}
+            for node in self.nodes:
+                if all(key[0] != node[0] for key in self.node_map[node].children):
+                    leaves.setdefault(node[0], set()).add(node[1])
+            self._leaves_by_app = leaves
+        return self._leaves_by_app
+
     def ensure_not_cyclic(self):
         # TODO Algo from GvR: 循环依赖检查 k1 → k2→ k3→ k1 会报错 (算法 Algo from GvR)
         # https://neopythonic.blogspot.com/2009/01/detecting-cycles-in-directed-graph.html
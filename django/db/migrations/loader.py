@@ -1,6 +1,9 @@
+import bisect
+import functools
 import pkgutil
 import sys
 from importlib import import_module, reload
+from importlib.util import module_from_spec
 
 from django.apps import apps
 from django.conf import settings
@@ -15,6 +18,24 @@ from .exceptions import (
 )
 
 MIGRATIONS_MODULE_NAME = "migrations"
+MIGRATIONS_MODULE_NAME_DOTTED = "." + MIGRATIONS_MODULE_NAME
+
+
+@functools.lru_cache(maxsize=None)
+def _migrations_module(app_label):
+    """ # 缓存app_label对应的迁移模块路径，避免每次build_graph重复查找
+    Memoized backend for MigrationLoader.migrations_module().
+
+    Both settings.MIGRATION_MODULES and app config names are stable within
+    a process, so the result can be cached per app_label. The cache is
+    cleared by the setting_changed receiver when MIGRATION_MODULES or
+    INSTALLED_APPS is overridden (e.g. in tests).
+    """
+    if app_label in settings.MIGRATION_MODULES:
+        return settings.MIGRATION_MODULES[app_label], True
+    else:
+        app_package_name = apps.get_app_config(app_label).name
+        return "%s.%s" % (app_package_name, MIGRATIONS_MODULE_NAME), False
 
 
 class MigrationLoader:
@@ -42,18 +63,35 @@ class MigrationLoader:
     in memory.
     """
 
+    # Prefix lengths indexed exactly in get_migration_by_prefix(); covers the
+    # usual numeric prefixes like "001"/"0001" typed on the command line.
+    PREFIX_BUCKET_LENGTHS = (3, 4, 5, 8)
+
     def __init__(
         self,
         connection,
         load=True,  # 是否加载迁移图 默认开启
         ignore_no_migrations=False,
         replace_migrations=True,
+        force_reload=False,
     ):
         self.connection = connection    # 传入数据库连接对象
         self.disk_migrations = None     # 磁盘迁移文件
+        self._migrations_by_app = None  # 每个app的迁移名排序列表(前缀查找索引)
+        self._prefix_index = None       # (app, 前缀长度) -> 前缀桶索引
         self.applied_migrations = None  # 完成的迁移文件
         self.ignore_no_migrations = ignore_no_migrations
         self.replace_migrations = replace_migrations
+        # Re-execute already-imported migrations packages. Nothing changes on
+        # disk during a normal management command, so only tests that swap
+        # migration modules under an existing name need this.
+        self.force_reload = force_reload
+        # Resolvers for the special dependency tokens, keyed so check_key()
+        # replaces its comparison chain with one dict lookup.
+        self._special_resolvers = {
+            "__first__": lambda app: self.graph.root_nodes(app)[0],
+            "__latest__": lambda app: self.graph.leaf_nodes(app)[0],
+        }
         if load:
             self.build_graph()  # 构建迁移图
 
@@ -64,18 +102,23 @@ class MigrationLoader:
         and a boolean indicating if the module is specified in
         settings.MIGRATION_MODULE.
         """
-        if app_label in settings.MIGRATION_MODULES:
-            return settings.MIGRATION_MODULES[app_label], True
-        else:
-            app_package_name = apps.get_app_config(app_label).name
-            return "%s.%s" % (app_package_name, MIGRATIONS_MODULE_NAME), False
+        return _migrations_module(app_label)
 
-    def load_disk(self):
+    def load_disk(self, force_reload=None):
         """Load the migrations from all INSTALLED_APPS from disk."""
+        if force_reload is None:
+            force_reload = self.force_reload
         self.disk_migrations = {}       #
         self.unmigrated_apps = set()    # 未迁移的app
         self.migrated_apps = set()      # 已经迁移的app
-        for app_config in apps.get_app_configs():
+        # Snapshot the app configs once per registry state; Apps.clear_cache()
+        # drops the memoized tuple whenever the registry changes.
+        app_configs = apps._migration_loader_app_configs
+        if app_configs is None:
+            app_configs = apps._migration_loader_app_configs = tuple(
+                apps.get_app_configs()
+            )
+        for app_config in app_configs:
             # Get the migrations module directory 导入格式 ("drf.migrations",False)
             module_name, explicit = self.migrations_module(app_config.label)
             if module_name is None:
@@ -85,8 +128,14 @@ class MigrationLoader:
             try:
                 module = import_module(module_name)    # 导入模块importlib.import_module
             except ModuleNotFoundError as e:           # 模块不存在处理
+                # String checks instead of e.name.split("."), which would
+                # allocate a list per unmigrated app on every load.
                 if (explicit and self.ignore_no_migrations) or (
-                    not explicit and MIGRATIONS_MODULE_NAME in e.name.split(".")
+                    not explicit
+                    and (
+                        e.name == MIGRATIONS_MODULE_NAME
+                        or e.name.endswith(MIGRATIONS_MODULE_NAME_DOTTED)
+                    )
                 ):
                     self.unmigrated_apps.add(app_config.label)
                     continue
@@ -105,39 +154,93 @@ class MigrationLoader:
                     self.unmigrated_apps.add(app_config.label)
                     continue
                 # 强制重新导入Force a reload if it's already loaded (tests need this)
-                if was_loaded:  # 如果模块已经导入过，重新导入
+                if force_reload and was_loaded:  # 如果模块已经导入过，重新导入
                     reload(module)
             self.migrated_apps.add(app_config.label)  #
+            # Interned labels/names hash once and compare by identity in the
+            # many (app_label, migration_name) key lookups downstream.
+            app_label = sys.intern(app_config.label)
             # 应用迁移模块下的所有文件
-            migration_names = {   # eg:django.contrib.auth.migrations
-                name    # iter_modules 遍历模块下的所有文件(如: 0001_inital.py)
-                for _, name, is_pkg in pkgutil.iter_modules(module.__path__)
-                if not is_pkg and name[0] not in "_~"
-            }
-            # Load migrations(
-            for migration_name in migration_names:  # ["0001_inital.py"]
+            # Load migrations. Use the finder yielded by iter_modules to
+            # exec each file directly instead of going through
+            # import_module(), which re-runs the whole meta-path machinery
+            # once per migration.
+            for finder, migration_name, is_pkg in pkgutil.iter_modules(module.__path__):
+                if is_pkg or migration_name[0] in "_~":
+                    continue
+                migration_name = sys.intern(migration_name)
                 migration_path = "%s.%s" % (module_name, migration_name)
-                try:
-                    migration_module = import_module(migration_path)  # 导入0001_inital.py文件
-                except ImportError as e:
-                    if "bad magic number" in str(e):
-                        raise ImportError(
-                            "Couldn't import %r as it appears to be a stale "
-                            ".pyc file." % migration_path
-                        ) from e
-                    else:
-                        raise
+                migration_module = sys.modules.get(migration_path)
+                if migration_module is None:
+                    try:
+                        find_spec = getattr(finder, "find_spec", None)
+                        if find_spec is None:
+                            # Some finders (zipimporter before Python 3.10)
+                            # have no find_spec(); take the generic import
+                            # path for those.
+                            migration_module = import_module(migration_path)
+                        else:
+                            spec = find_spec(migration_path)
+                            if spec is None:
+                                raise ImportError(
+                                    "No module named %r" % migration_path,
+                                    name=migration_path,
+                                )
+                            migration_module = module_from_spec(spec)
+                            # Match the import system: register before exec so
+                            # the migration can reference itself, unregister
+                            # on failure.
+                            sys.modules[migration_path] = migration_module
+                            try:
+                                spec.loader.exec_module(migration_module)
+                            except BaseException:
+                                sys.modules.pop(migration_path, None)
+                                raise
+                            setattr(module, migration_name, migration_module)
+                    except ImportError as e:
+                        if "bad magic number" in str(e):
+                            raise ImportError(
+                                "Couldn't import %r as it appears to be a stale "
+                                ".pyc file." % migration_path
+                            ) from e
+                        else:
+                            raise
                 if not hasattr(migration_module, "Migration"):   # 判断是否有Migration类
                     raise BadMigrationError(
                         "Migration %s in app %s has no Migration class"
-                        % (migration_name, app_config.label)
+                        % (migration_name, app_label)
                     )
-                self.disk_migrations[
-                    app_config.label, migration_name   # key("drf","0001_inital.py")
-                ] = migration_module.Migration(
+                migration = migration_module.Migration(
                     migration_name,
-                    app_config.label,
+                    app_label,
                 )   # 实例化类 Migration
+                # Disk-loaded migrations are never mutated, so freeze the
+                # dependency lists; tuples iterate faster across the repeated
+                # build_graph passes.
+                migration.dependencies = tuple(migration.dependencies)
+                migration.run_before = tuple(migration.run_before)
+                # Most migrations only depend on their own app; flag the rest
+                # so build_graph can skip the external-dependency pass body.
+                migration._has_external_dependencies = bool(migration.run_before) or any(
+                    parent[0] != app_label for parent in migration.dependencies
+                )
+                self.disk_migrations[
+                    app_label, migration_name   # key("drf","0001_inital.py")
+                ] = migration
+        # Index the migration names per app for prefix lookups. Rebuilt here
+        # so it can never go stale relative to disk_migrations. The exact
+        # buckets cover the common CLI prefixes ("001", "0001", ...) in O(1);
+        # other lengths fall back to bisecting the sorted lists.
+        self._migrations_by_app = {}
+        self._prefix_index = {}
+        for app_label, migration_name in self.disk_migrations:
+            self._migrations_by_app.setdefault(app_label, []).append(migration_name)
+            for length in self.PREFIX_BUCKET_LENGTHS:
+                self._prefix_index.setdefault((app_label, length), {}).setdefault(
+                    migration_name[:length], []
+                ).append(migration_name)
+        for names in self._migrations_by_app.values():
+            names.sort()
 
     def get_migration(self, app_label, name_prefix):
         """Return the named migration or raise NodeNotFoundError."""
@@ -147,13 +250,17 @@ class MigrationLoader:
         """
         Return the migration(s) which match the given app label and name_prefix.
         """
-        # Do the search
-        results = []
-        for migration_app_label, migration_name in self.disk_migrations:
-            if migration_app_label == app_label and migration_name.startswith(
-                name_prefix
-            ):
-                results.append((migration_app_label, migration_name))
+        # 二分查找前缀区间 Binary-search the sorted per-app index for the
+        # range of names sharing the prefix instead of scanning every key.
+        bucket = self._prefix_index.get((app_label, len(name_prefix)))
+        if bucket is not None:
+            # Exact bucket hit for the common prefix lengths, O(1).
+            results = bucket.get(name_prefix, [])
+        else:
+            names = self._migrations_by_app.get(app_label, [])
+            start = bisect.bisect_left(names, name_prefix)
+            end = bisect.bisect_left(names, name_prefix + "\uffff", start)
+            results = names[start:end]
         if len(results) > 1:
             raise AmbiguityError(
                 "There is more than one migration for '%s' with the prefix '%s'"
@@ -165,10 +272,11 @@ class MigrationLoader:
                 f"'{name_prefix}'"
             )
         else:
-            return self.disk_migrations[results[0]]
+            return self.disk_migrations[app_label, results[0]]
 
     def check_key(self, key, current_app):
-        if (key[1] != "__first__" and key[1] != "__latest__") or key in self.graph:
+        resolver = self._special_resolvers.get(key[1])
+        if resolver is None or key in self.graph:
             return key
         # Special-case __first__, which means "the first migration" for
         # migrated apps, and is ignored for unmigrated apps. It allows
@@ -184,10 +292,7 @@ class MigrationLoader:
             return
         if key[0] in self.migrated_apps:
             try:
-                if key[1] == "__first__":
-                    return self.graph.root_nodes(key[0])[0]
-                else:  # "__latest__"
-                    return self.graph.leaf_nodes(key[0])[0]
+                return resolver(key[0])
             except IndexError:
                 if self.ignore_no_migrations:
                     return None
@@ -238,34 +343,42 @@ class MigrationLoader:
         # and their dependencies. Also make note of replacing migrations at this step.
         self.graph = MigrationGraph()
         self.replacements = {}
+        self.replaces_index = {}    # 被替换节点 -> 替换它的squash迁移key集合
+        applied_migrations = self.applied_migrations    # 局部引用避免重复属性查找
         for key, migration in self.disk_migrations.items():
             self.graph.add_node(key, migration)     # 添加所有节点
             # Replacing migrations.
             if migration.replaces:      # 替换节点
                 self.replacements[key] = migration
-        for key, migration in self.disk_migrations.items():
-            # Internal (same app) dependencies.
+                for replaced in migration.replaces:
+                    self.replaces_index.setdefault(replaced, set()).add(key)
+                # Applied status of the replacement targets, computed once
+                # here rather than per-iteration in the replacement pass.
+                applied_statuses = [
+                    (target in applied_migrations) for target in migration.replaces
+                ]
+                migration._all_applied = all(applied_statuses)
+                migration._none_applied = not any(applied_statuses)
+            # Internal (same app) dependencies can be added in the same pass:
+            # same-app parents not yet added become dummy nodes that
+            # add_node() promotes when it reaches them.
             self.add_internal_dependencies(key, migration)  # 添加内部依赖
         # Add external dependencies now that the internal ones have been resolved.
         for key, migration in self.disk_migrations.items():
-            self.add_external_dependencies(key, migration)  # 添加外部依赖
+            if migration._has_external_dependencies:
+                self.add_external_dependencies(key, migration)  # 添加外部依赖
         # 执行替换 Carry out replacements where possible and if enabled.
         if self.replace_migrations:
             for key, migration in self.replacements.items():
-                # Get applied status of each of this migration's replacement
-                # targets.
-                applied_statuses = [
-                    (target in self.applied_migrations) for target in migration.replaces
-                ]
                 # The replacing migration is only marked as applied if all of
                 # its replacement targets are.
-                if all(applied_statuses):
+                if migration._all_applied:
                     self.applied_migrations[key] = migration
                 else:
                     self.applied_migrations.pop(key, None)
                 # A replacing migration can be used if either all or none of
                 # its replacement targets have been applied.
-                if all(applied_statuses) or (not any(applied_statuses)):
+                if migration._all_applied or migration._none_applied:
                     self.graph.remove_replaced_nodes(key, migration.replaces)
                 else:
                     # This replacing migration cannot be used because it is
@@ -280,14 +393,9 @@ class MigrationLoader:
             # migration but wasn't because the squash migration was partially
             # applied before. In that case raise a more understandable exception
             # (#23556).
-            # Get reverse replacements.
-            reverse_replacements = {}
-            for key, migration in self.replacements.items():
-                for replaced in migration.replaces:
-                    reverse_replacements.setdefault(replaced, set()).add(key)
             # Try to reraise exception with more detail.
-            if exc.node in reverse_replacements:
-                candidates = reverse_replacements.get(exc.node, set())
+            if exc.node in self.replaces_index:
+                candidates = self.replaces_index.get(exc.node, set())
                 is_replaced = any(
                     candidate in self.graph.nodes for candidate in candidates
                 )
@@ -311,30 +419,34 @@ class MigrationLoader:
         """
         recorder = MigrationRecorder(connection)
         applied = recorder.applied_migrations()    # todo 迁移记录
+        applied_set = set(applied)  # Node与key元组按key哈希/比较，可直接做差集
+        node_map = self.graph.node_map
+        graph_nodes = self.graph.nodes
         for migration in applied:   # 遍历迁移记录
             # If the migration is unknown, skip it. 如果迁移未知，则跳过它。迁移文件没有数据库有
-            if migration not in self.graph.nodes:
+            if migration not in graph_nodes:
                 continue
-            for parent in self.graph.node_map[migration].parents:
-                if parent not in applied:
-                    # Skip unapplied squashed migrations that have all of their
-                    # `replaces` applied.
-                    if parent in self.replacements:
-                        if all(
-                            m in applied for m in self.replacements[parent].replaces
-                        ):
-                            continue
-                    # parent not in self.replacements # parent 不在替换列表里面
-                    raise InconsistentMigrationHistory(
-                        "Migration {}.{} is applied before its dependency "
-                        "{}.{} on database '{}'.".format(
-                            migration[0],
-                            migration[1],
-                            parent[0],
-                            parent[1],
-                            connection.alias,
-                        )
+            # The set difference finds unapplied parents at C speed; only
+            # those (rare) need the squash-replacement check.
+            for parent in node_map[migration].parents - applied_set:
+                # Skip unapplied squashed migrations that have all of their
+                # `replaces` applied.
+                if parent in self.replacements:
+                    if all(
+                        m in applied_set for m in self.replacements[parent].replaces
+                    ):
+                        continue
+                # parent not in self.replacements # parent 不在替换列表里面
+                raise InconsistentMigrationHistory(
+                    "Migration {}.{} is applied before its dependency "
+                    "{}.{} on database '{}'.".format(
+                        migration[0],
+                        migration[1],
+                        parent[0],
+                        parent[1],
+                        connection.alias,
                     )
+                )
 
     def detect_conflicts(self):
         """ app最后迁移存在多个叶子节点
@@ -343,14 +455,10 @@ class MigrationLoader:
         with more than one leaf migration. Return a dict of the app labels
         that conflict with the migration names that conflict.
         """
-        seen_apps = {}
-        conflicting_apps = set()
-        for app_label, migration_name in self.graph.leaf_nodes():
-            if app_label in seen_apps:
-                conflicting_apps.add(app_label)
-            seen_apps.setdefault(app_label, set()).add(migration_name)
         return {
-            app_label: sorted(seen_apps[app_label]) for app_label in conflicting_apps
+            app_label: sorted(migration_names)
+            for app_label, migration_names in self.graph.leaves_by_app().items()
+            if len(migration_names) > 1
         }
 
     def project_state(self, nodes=None, at_end=True):
@@ -1,3 +1,6 @@
+import functools
+from collections import namedtuple
+
 from django.apps.registry import Apps
 from django.db import DatabaseError, models
 from django.utils.functional import classproperty
@@ -5,6 +8,34 @@ from django.utils.timezone import now
 
 from .exceptions import MigrationSchemaMissing
 
+# Lightweight row for applied_migrations(); keeps the .applied attribute of
+# the Migration model without instantiating one per row.
+MigrationRecord = namedtuple("MigrationRecord", ["app", "name", "applied"])
+
+
+@functools.lru_cache(maxsize=None)
+def _get_migration_model():
+    """构建内部迁移模型类(进程内只构建一次)
+    Build the historical model used to read/write the django_migrations
+    table. Deferred so importing MigrationRecorder doesn't require a ready
+    app registry.
+    """
+
+    class Migration(models.Model):  # 定义模型迁移类
+        app = models.CharField(max_length=255)
+        name = models.CharField(max_length=255)
+        applied = models.DateTimeField(default=now)
+
+        class Meta:
+            apps = Apps()
+            app_label = "migrations"
+            db_table = "django_migrations"
+
+        def __str__(self):
+            return "Migration %s for %s" % (self.name, self.app)
+
+    return Migration
+
 
 class MigrationRecorder:
     """ 迁移记录的保存 关联 django_migrations表
@@ -19,35 +50,21 @@ class MigrationRecorder:
     a row in the table always means a migration is applied.
     """
 
-    _migration_class = None     # Migration(models.Model):  # 定义内部模型迁移类
-
     @classproperty
     def Migration(cls):
-        """定义返回模型迁移类   _migration_class = Migration
+        """定义返回模型迁移类
         Lazy load to avoid AppRegistryNotReady if installed apps import
-        MigrationRecorder.
+        MigrationRecorder. The first access replaces this descriptor with
+        the model itself, so later lookups are plain attribute reads.
         """
-        if cls._migration_class is None:
-            #   We use the historical model to read migrations from the table 翻译 ：我们使用历史模型从表中读取迁移
-            class Migration(models.Model):  # 定义模型迁移类
-                app = models.CharField(max_length=255)
-                name = models.CharField(max_length=255)
-                applied = models.DateTimeField(default=now)
-
-                class Meta:
-                    apps = Apps()
-                    app_label = "migrations"
-                    db_table = "django_migrations"
-
-                def __str__(self):
-                    return "Migration %s for %s" % (self.name, self.app)
-
-            cls._migration_class = Migration
-        return cls._migration_class
+        cls.Migration = model = _get_migration_model()
+        return model
 
     def __init__(self, connection):
         """迁移记录的保存"""
         self.connection = connection    # 传入数据库连接对象 \django\db\__init__.py
+        self._applied_cache = None      # applied_migrations查询结果缓存
+        self._has_table = None          # django_migrations表是否存在的缓存
 
     @property
     def migration_qs(self):
@@ -56,9 +73,11 @@ class MigrationRecorder:
 
     def has_table(self):
         """ # 如果django_migrations表存在，则返回True。Return True if the django_migrations table exists. """
-        with self.connection.cursor() as cursor:
-            tables = self.connection.introspection.table_names(cursor)  # TODO 返回数据库中的所有表名
-        return self.Migration._meta.db_table in tables # "django_migrations"
+        if self._has_table is None:
+            with self.connection.cursor() as cursor:
+                tables = self.connection.introspection.table_names(cursor)  # TODO 返回数据库中的所有表名
+            self._has_table = self.Migration._meta.db_table in tables # "django_migrations"
+        return self._has_table
 
     def ensure_schema(self):
         """ # # 确保表存不存在创建 Ensure the table exists and has the correct schema. """
@@ -73,28 +92,37 @@ class MigrationRecorder:
             raise MigrationSchemaMissing(
                 "Unable to create the django_migrations table (%s)" % exc
             )
+        self._has_table = True
 
     def applied_migrations(self):
         """ # 元祖为key 迁移  (migration.app, migration.name): migration。Return a dict mapping (app_name, migration_name) to Migration instances for all applied migrations.          """
-        if self.has_table():
-            return {
-                (migration.app, migration.name): migration for migration in self.migration_qs
-            }
-        else:
-            # If the django_migrations table doesn't exist, then no migrations
-            # are applied.
-            return {}
+        if self._applied_cache is None:
+            if self.has_table():
+                self._applied_cache = {
+                    (app, name): MigrationRecord(app, name, applied)
+                    for app, name, applied in self.migration_qs.values_list(
+                        "app", "name", "applied"
+                    ).iterator()
+                }
+            else:
+                # If the django_migrations table doesn't exist, then no migrations
+                # are applied.
+                self._applied_cache = {}
+        return self._applied_cache
 
     def record_applied(self, app, name):
         """新增迁移记录Record that a migration was applied."""
         self.ensure_schema()
         self.migration_qs.create(app=app, name=name)
+        self._applied_cache = None
 
     def record_unapplied(self, app, name):
         """删除迁移记录Record that a migration was unapplied."""
         self.ensure_schema()
         self.migration_qs.filter(app=app, name=name).delete()
+        self._applied_cache = None
 
     def flush(self):
         """删除所有迁移记录 Delete all migration records. Useful for testing migrations."""
         self.migration_qs.all().delete()
+        self._applied_cache = None
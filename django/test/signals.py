@@ -119,6 +119,14 @@ def clear_serializers_cache(**kwargs):
         serializers._serializers = {}
 
 
+@receiver(setting_changed)
+def clear_migrations_module_cache(**kwargs):
+    if kwargs["setting"] in {"MIGRATION_MODULES", "INSTALLED_APPS"}:
+        from django.db.migrations.loader import _migrations_module
+
+        _migrations_module.cache_clear()
+
+
 @receiver(setting_changed)
 def language_changed(**kwargs):
     if kwargs["setting"] in {"LANGUAGES", "LANGUAGE_CODE", "LOCALE_PATHS"}:
@@ -1,6 +1,8 @@
 import compileall
 import os
-from importlib import import_module
+import sys
+from importlib import import_module, reload
+from unittest import mock
 
 from django.db import connection, connections
 from django.db.migrations.exceptions import (
@@ -100,6 +102,25 @@ class LoaderTests(TestCase):
         # Ensure we've included unmigrated apps in there too
         self.assertIn("basic", project_state.real_apps)
 
+    @override_settings(MIGRATION_MODULES={"migrations": "migrations.test_migrations"})
+    def test_force_reload(self):
+        """
+        load_disk() only re-executes an already-imported migrations package
+        when force_reload is requested.
+        """
+        loader = MigrationLoader(connection, load=False)
+        loader.load_disk()  # Ensure the package is in sys.modules.
+        module = sys.modules["migrations.test_migrations"]
+        with mock.patch("django.db.migrations.loader.reload", wraps=reload) as mocked:
+            loader.load_disk()
+            mocked.assert_not_called()
+            loader.load_disk(force_reload=True)
+            self.assertIn(mock.call(module), mocked.call_args_list)
+        # The constructor flag takes the same path.
+        with mock.patch("django.db.migrations.loader.reload", wraps=reload) as mocked:
+            MigrationLoader(connection, force_reload=True)
+            self.assertIn(mock.call(module), mocked.call_args_list)
+
     @override_settings(
         MIGRATION_MODULES={
             "migrations": "migrations.test_migrations",